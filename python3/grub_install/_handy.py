@@ -24,6 +24,7 @@
 import os
 import pathlib
 import tempfile
+import functools
 import subprocess
 from ._util import PartiUtil
 from ._const import PlatformType
@@ -102,6 +103,7 @@ class Handy:
         ]
 
     @staticmethod
+    @functools.lru_cache(maxsize=None)
     def getStandardEfiFilename(platform_type):
         # The specification makes stricter requirements of removable
         #  devices, in order that only one image can be automatically loaded
@@ -209,6 +211,7 @@ class Grub:
         return (moduleList, hints)
 
     @staticmethod
+    @functools.lru_cache(maxsize=None)
     def getCoreImgNameAndTarget(platform_type):
         if platform_type == PlatformType.I386_PC:
             core_name = "core.img"
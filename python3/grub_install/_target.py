@@ -26,15 +26,21 @@ import glob
 import shutil
 import struct
 import parted
-import pathlib
 import reedsolo
-from ._util import rel_path, force_rm, force_mkdir, rmdir_if_empty, compare_file_and_content, compare_files, compare_directories, is_buffer_all_zero, PartiUtil
+import concurrent.futures
+from ._util import rel_path, force_rm, force_mkdir, rmdir_if_empty, compare_file_and_content, compare_files, compare_directories, is_buffer_all_zero, DirCache, PartiUtil
 from ._const import TargetType, TargetAccessMode, PlatformType, PlatformInstallInfo
 from ._errors import TargetError, InstallError, CompareWithSourceError
 from ._handy import Handy, Grub, GrubMountPoint
 from ._source import Source
 
 
+_PLATFORM_BY_VALUE = {pt.value: pt for pt in PlatformType}
+
+# maximum size of boot.img plus (possibly rs-encoded) core.img in the MBR gap
+_CORE_BUF_MAX_SIZE = Grub.DISK_SECTOR_SIZE * 1024
+
+
 class Target:
 
     def __init__(self, target_type, target_access_mode, **kwargs):
@@ -55,14 +61,16 @@ class Target:
             else:
                 self._mnt = GrubMountPoint(bootMnt, False)
                 self._bootDir = self._mnt.mountpoint
+            self._grubDir = os.path.join(self._bootDir, "grub")
         elif self._targetType == TargetType.PYCDLIB_OBJ:
             assert self._mode in [TargetAccessMode.R, TargetAccessMode.W]
             self._iso = kwargs.get["obj"]
         elif self._targetType == TargetType.ISO_DIR:
             self._dir = kwargs["dir"]
             self._bootDir = os.path.join(self._dir, "boot")
+            self._grubDir = os.path.join(self._bootDir, "grub")
         else:
-            assert False
+            raise ValueError("invalid target type %s" % (self._targetType))
 
         # fill self._platforms
         self._platforms = dict()
@@ -76,7 +84,7 @@ class Target:
                         elif Handy.isPlatformEfi(k):
                             _Efi.fill_platform_install_info(k, v, self._targetType, self._mnt.mountpoint, self._bootDir)
                         else:
-                            assert False
+                            raise TargetError("unsupported platform %s" % (k.value))
                     except TargetError as e:
                         self._platforms[k] = _newNotValidPlatformInstallInfo(str(e))
             elif self._targetType == TargetType.PYCDLIB_OBJ:
@@ -84,13 +92,11 @@ class Target:
                 for k, v in self._platforms.items():
                     try:
                         if k == PlatformType.I386_PC:
-                            # FIXME
-                            assert False
+                            raise TargetError("platform %s is not supported for pycdlib target yet" % (k.value))      # FIXME
                         elif Handy.isPlatformEfi(k):
-                            # FIXME
-                            assert False
+                            raise TargetError("platform %s is not supported for pycdlib target yet" % (k.value))      # FIXME
                         else:
-                            assert False
+                            raise TargetError("unsupported platform %s" % (k.value))
                     except TargetError as e:
                         self._platforms[k] = _newNotValidPlatformInstallInfo(str(e))
             elif self._targetType == TargetType.ISO_DIR:
@@ -102,11 +108,11 @@ class Target:
                         elif Handy.isPlatformEfi(k):
                             _Efi.fill_platform_install_info(k, v, self._targetType, self._dir, self._bootDir)
                         else:
-                            assert False
+                            raise TargetError("unsupported platform %s" % (k.value))
                     except TargetError as e:
                         self._platforms[k] = _newNotValidPlatformInstallInfo(str(e))
             else:
-                assert False
+                raise ValueError("invalid target type %s" % (self._targetType))
 
     @property
     def target_type(self):
@@ -152,10 +158,9 @@ class Target:
                                           kwargs.get("removable", False),                               # bRemovable
                                           kwargs.get("update_nvram", True))                             # bUpdateNvram
             else:
-                assert False
+                raise ValueError("unsupported platform %s" % (platform_type.value))
         elif self._targetType == TargetType.PYCDLIB_OBJ:
-            # FIXME
-            assert False
+            raise NotImplementedError("pycdlib target is not supported yet")        # FIXME
         elif self._targetType == TargetType.ISO_DIR:
             _Common.install_platform(self, platform_type, source,
                                      tmpDir=self._tmpDir,
@@ -167,9 +172,9 @@ class Target:
                                           kwargs.get("removable", False),                               # bRemovable
                                           False)                                                        # bUpdateNvram
             else:
-                assert False
+                raise ValueError("unsupported platform %s" % (platform_type.value))
         else:
-            assert False
+            raise ValueError("invalid target type %s" % (self._targetType))
 
         self._platforms[platform_type] = ret
 
@@ -188,21 +193,20 @@ class Target:
             elif Handy.isPlatformEfi(platform_type):
                 _Efi.remove_from_efi_dir(platform_type, self._mnt.mountpoint, self._bootDir)
             else:
-                assert False
+                raise ValueError("unsupported platform %s" % (platform_type.value))
             _Common.remove_platform(self, platform_type)
         elif self._targetType == TargetType.PYCDLIB_OBJ:
-            # FIXME
-            assert False
+            raise NotImplementedError("pycdlib target is not supported yet")        # FIXME
         elif self._targetType == TargetType.ISO_DIR:
             if platform_type == PlatformType.I386_PC:
                 pass
             elif Handy.isPlatformEfi(platform_type):
                 _Efi.remove_from_efi_dir(platform_type, self._dir, self._bootDir)
             else:
-                assert False
+                raise ValueError("unsupported platform %s" % (platform_type.value))
             _Common.remove_platform(self, platform_type)
         else:
-            assert False
+            raise ValueError("invalid target type %s" % (self._targetType))
 
         # delete PlatformInstallInfo object
         del self._platforms[platform_type]
@@ -216,46 +220,71 @@ class Target:
         if themes is not None:
             assert source.supports(source.CAP_THEMES)
 
-        grubDir = os.path.join(self._bootDir, "grub")
+        grubDir = self._grubDir
         force_mkdir(grubDir)
 
-        if locales is not None:
+        def __installLocales():
             dstDir = os.path.join(grubDir, "locale")
             force_mkdir(dstDir, clear=True)
             if locales == "*":
                 for lname, fullfn in source.get_all_locale_files().items():
-                    shutil.copy(fullfn, os.path.join(dstDir, "%s.mo" % (lname)))
+                    shutil.copyfile(fullfn, os.path.join(dstDir, "%s.mo" % (lname)))
             else:
                 for lname in locales:
-                    shutil.copy(source.get_locale_file(lname), "%s.mo" % (lname))
+                    shutil.copyfile(source.get_locale_file(lname), os.path.join(dstDir, "%s.mo" % (lname)))
 
-        if fonts is not None:
+        def __installFonts():
             dstDir = os.path.join(grubDir, "fonts")
             force_mkdir(dstDir, clear=True)
             if fonts == "*":
                 for fname, fullfn in source.get_all_font_files().items():
-                    shutil.copy(fullfn, dstDir)
+                    shutil.copyfile(fullfn, os.path.join(dstDir, "%s.pf2" % (fname)))
             else:
                 for fname in fonts:
-                    shutil.copy(source.get_font_file(fname), dstDir)
+                    shutil.copyfile(source.get_font_file(fname), os.path.join(dstDir, "%s.pf2" % (fname)))
 
-        if themes is not None:
+        def __installThemes():
             dstDir = os.path.join(grubDir, "themes")
             force_mkdir(dstDir, clear=True)
             if themes == "*":
-                for tname, fullfn in source.get_all_theme_directories():
-                    shutil.copytree(fullfn, dstDir)
+                for tname, fullfn in source.get_all_theme_directories().items():
+                    shutil.copytree(fullfn, os.path.join(dstDir, tname))
             else:
                 for tname in themes:
-                    shutil.copytree(source.get_theme_directory(tname), dstDir)
+                    shutil.copytree(source.get_theme_directory(tname), os.path.join(dstDir, tname))
+
+        jobs = []
+        if locales is not None:
+            jobs.append(__installLocales)
+        if fonts is not None:
+            jobs.append(__installFonts)
+        if themes is not None:
+            jobs.append(__installThemes)
+
+        # the three data sets live in disjoint directories, copy them
+        # concurrently so file I/O overlaps (python releases the GIL there)
+        if len(jobs) > 1:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+                for fut in [pool.submit(job) for job in jobs]:
+                    fut.result()
+        elif len(jobs) == 1:
+            jobs[0]()
 
     def remove_data_files(self):
         assert self._mode in [TargetAccessMode.RW, TargetAccessMode.W]
 
-        grubDir = os.path.join(self._bootDir, "grub")
-        force_rm(os.path.join(grubDir, "locale"))
-        force_rm(os.path.join(grubDir, "fonts"))
-        force_rm(os.path.join(grubDir, "themes"))
+        # one directory read finds all three, no stat for absent ones
+        grubDir = self._grubDir
+        try:
+            with os.scandir(grubDir) as it:
+                for entry in it:
+                    if entry.name in ("locale", "fonts", "themes"):
+                        if entry.is_dir(follow_symlinks=False):
+                            shutil.rmtree(entry.path)
+                        else:
+                            os.remove(entry.path)
+        except FileNotFoundError:
+            pass
 
     def remove_all(self):
         assert self._mode in [TargetAccessMode.RW, TargetAccessMode.W]
@@ -268,12 +297,11 @@ class Target:
         if self._targetType == TargetType.MOUNTED_HDD_DEV:
             _Efi.remove_remaining_crufts(self._mnt.mountpoint, self._bootDir)
         elif self._targetType == TargetType.PYCDLIB_OBJ:
-            # FIXME
-            assert False
+            raise NotImplementedError("pycdlib target is not supported yet")        # FIXME
         elif self._targetType == TargetType.ISO_DIR:
             _Efi.remove_remaining_crufts(self._dir, self._bootDir)
         else:
-            assert False
+            raise ValueError("invalid target type %s" % (self._targetType))
         _Common.remove_remaining_crufts(self)
 
     def compare_with_source(self, source):
@@ -288,10 +316,9 @@ class Target:
                 elif Handy.isPlatformEfi(pt):
                     pass
                 else:
-                    assert False
+                    raise ValueError("unsupported platform %s" % (pt.value))
             elif self._targetType == TargetType.PYCDLIB_OBJ:
-                # FIXME
-                assert False
+                raise NotImplementedError("pycdlib target is not supported yet")    # FIXME
             elif self._targetType == TargetType.ISO_DIR:
                 restFiles = _Common.check_platform(self, pt, source, tmpDir=self._tmpDir)
                 if pt == PlatformType.I386_PC:
@@ -299,9 +326,9 @@ class Target:
                 elif Handy.isPlatformEfi(pt):
                     pass
                 else:
-                    assert False
+                    raise ValueError("unsupported platform %s" % (pt.value))
             else:
-                assert False
+                raise ValueError("invalid target type %s" % (self._targetType))
 
         _Common.check_data(self, source)
 
@@ -310,19 +337,19 @@ class _Common:
 
     @staticmethod
     def init_platforms(p):
-        grubDir = os.path.join(p._bootDir, "grub")
+        grubDir = p._grubDir
         if os.path.isdir(grubDir):
-            for fn in os.listdir(grubDir):
-                try:
-                    obj = PlatformInstallInfo()
-                    obj.status = PlatformInstallInfo.Status.NORMAL
-                    p._platforms[PlatformType(fn)] = obj
-                except ValueError:
-                    pass
+            with os.scandir(grubDir) as it:
+                for entry in it:
+                    pt = _PLATFORM_BY_VALUE.get(entry.name)
+                    if pt is not None:
+                        obj = PlatformInstallInfo()
+                        obj.status = PlatformInstallInfo.Status.NORMAL
+                        p._platforms[pt] = obj
 
     @staticmethod
     def install_platform(p, platform_type, source, tmpDir=None, debugImage=None):
-        grubDir = os.path.join(p._bootDir, "grub")
+        grubDir = p._grubDir
         platDirSrc = source.get_platform_directory(platform_type)
         platDirDst = os.path.join(grubDir, platform_type.value)
 
@@ -342,7 +369,8 @@ class _Common:
 
             def __copy(fullfn, dstDir):
                 # FIXME: specify owner, group, mode?
-                shutil.copy(fullfn, platDirDst)
+                # shutil.copyfile copies with os.sendfile on linux, no userspace bounce buffer
+                shutil.copyfile(fullfn, os.path.join(dstDir, os.path.basename(fullfn)))
 
             # copy module files
             for fullfn in glob.glob(os.path.join(platDirSrc, "*.mod")):
@@ -367,18 +395,18 @@ class _Common:
 
     @staticmethod
     def remove_platform(p, platform_type):
-        platDir = os.path.join(p._bootDir, "grub", platform_type.value)
+        platDir = os.path.join(p._grubDir, platform_type.value)
         force_rm(platDir)
 
     @staticmethod
     def remove_remaining_crufts(p):
-        force_rm(os.path.join(p._bootDir, "grub"))
+        force_rm(p._grubDir)
 
     @staticmethod
     def check_platform(p, platform_type, source, tmpDir=None):
-        grubDir = os.path.join(p._bootDir, "grub")
+        grubDir = p._grubDir
         platDirSrc = source.get_platform_directory(platform_type)
-        platDirDst = os.path.join(p._bootDir, "grub", platform_type.value)
+        platDirDst = os.path.join(p._grubDir, platform_type.value)
         assert os.path.exists(platDirDst)
 
         fileSet = set()
@@ -427,23 +455,27 @@ class _Common:
 
     @staticmethod
     def check_data(p, source):
-        localeDir = os.path.join(p._bootDir, "grub", "locale")
-        if os.path.exists(localeDir):
+        # answer the three existence queries from one listing of the grub directory
+        grubDirCache = DirCache()
+
+        localeDir = os.path.join(p._grubDir, "locale")
+        if grubDirCache.has_child(os.path.dirname(localeDir), "locale"):
             if not source.supports(source.CAP_NLS):
                 raise CompareWithSourceError("NLS is not supported")
-            for fn2 in os.listdir(localeDir):
-                fullfn2 = os.path.join(localeDir, fn2)
-                if fn2.endswith(".mo"):
-                    lname = fn2.replace(".mo", "")
-                    fullfn = source.try_get_locale_file(lname)
-                    if fullfn is not None:
-                        if not compare_files(fullfn, fullfn2):
-                            raise CompareWithSourceError("%s and %s are different" % (fullfn, fullfn2))
-                        continue
-                raise CompareWithSourceError("redundant file %s found" % (fullfn2))
-
-        fontsDir = os.path.join(p._bootDir, "grub", "fonts")
-        if os.path.exists(fontsDir):
+            with os.scandir(localeDir) as it:
+                for entry in it:
+                    fullfn2 = entry.path
+                    if entry.name.endswith(".mo"):
+                        lname = entry.name.replace(".mo", "")
+                        fullfn = source.try_get_locale_file(lname)
+                        if fullfn is not None:
+                            if not compare_files(fullfn, fullfn2):
+                                raise CompareWithSourceError("%s and %s are different" % (fullfn, fullfn2))
+                            continue
+                    raise CompareWithSourceError("redundant file %s found" % (fullfn2))
+
+        fontsDir = os.path.join(p._grubDir, "fonts")
+        if grubDirCache.has_child(os.path.dirname(fontsDir), "fonts"):
             if not source.supports(source.CAP_FONTS):
                 raise CompareWithSourceError("fonts is not supported")
             for fullfn2 in glob.glob(os.path.join(fontsDir, "*.pf2")):
@@ -455,23 +487,32 @@ class _Common:
                     continue
                 raise CompareWithSourceError("redundant file %s found" % (fullfn2))
 
-        themesDir = os.path.join(p._bootDir, "grub", "themes")
-        if os.path.exists(themesDir):
+        themesDir = os.path.join(p._grubDir, "themes")
+        if grubDirCache.has_child(os.path.dirname(themesDir), "themes"):
             if not source.supports(source.CAP_THEMES):
                 raise CompareWithSourceError("themes is not supported")
-            for tname in os.listdir(themesDir):
-                fullfn2 = os.path.join(themesDir, tname)
-                if os.path.isdir(fullfn2):
-                    fullfn = source.try_get_theme_directory(tname)
-                    if fullfn is not None:
-                        if not compare_directories(fullfn, fullfn2):
-                            raise CompareWithSourceError("%s and %s are different" % (fullfn, fullfn2))
-                        continue
-                raise CompareWithSourceError("redundant file %s found" % (fullfn2))
+            with os.scandir(themesDir) as it:
+                for entry in it:
+                    fullfn2 = entry.path
+                    if entry.is_dir():
+                        fullfn = source.try_get_theme_directory(entry.name)
+                        if fullfn is not None:
+                            if not compare_directories(fullfn, fullfn2):
+                                raise CompareWithSourceError("%s and %s are different" % (fullfn, fullfn2))
+                            continue
+                    raise CompareWithSourceError("redundant file %s found" % (fullfn2))
 
 
 class _Bios:
 
+    # regions of the on-disk MBR that install_with_mbr() deliberately keeps
+    # machine specific: the DOS BPB and the area from the windows-nt magic
+    # number up to the end of the partition table
+    _MBR_VOLATILE_REGIONS = [
+        (Grub.BOOT_MACHINE_BPB_START, Grub.BOOT_MACHINE_BPB_END),
+        (Grub.BOOT_MACHINE_WINDOWS_NT_MAGIC, Grub.BOOT_MACHINE_PART_END),
+    ]
+
     @classmethod
     def fill_platform_install_info_without_mbr(cls, platform_type, platform_install_info, bootDir):
         cls._checkAndReadBootImg(platform_type, bootDir, TargetError)
@@ -492,17 +533,24 @@ class _Bios:
         cls._checkDisk(dev, TargetError)
         with open(dev, "rb") as f:
             tmpBootBuf = f.read(len(bootBuf))
-            tmpRestBuf = f.read(cls._getCoreBufMaxSize() - len(bootBuf))
+            tmpRestBuf = f.read(_CORE_BUF_MAX_SIZE - len(bootBuf))
 
         # boot.img and core.img is not installed
-        if tmpBootBuf == cls._getAllZeroBootBuf(tmpBootBuf) and is_buffer_all_zero(tmpRestBuf):
+        # (byte 0 lies outside all volatile regions and is non-zero for any
+        #  installed boot.img, so it cheaply rejects the all-zero candidate
+        #  before the full-sector memcmp; bytes equality already compares in C)
+        if tmpBootBuf[0] == 0 and tmpBootBuf == cls._getAllZeroBootBuf(tmpBootBuf) and is_buffer_all_zero(tmpRestBuf):
             raise TargetError("boot.img and core.img are not installed to disk")
 
+        # memoryview slices compare through C memcmp without copying
+        mvBootBuf = memoryview(tmpBootBuf)
+        mvRestBuf = memoryview(tmpRestBuf)
+
         # compare boot.img
         if True:
             # see comment in cls.install_into_mbr()
             s, e = Grub.BOOT_MACHINE_BPB_START, Grub.BOOT_MACHINE_BPB_END
-            if not is_buffer_all_zero(tmpBootBuf[s:e]):
+            if not is_buffer_all_zero(mvBootBuf[s:e]):
                 bootBuf[s:e] = tmpBootBuf[s:e]
                 bBpb = True
             else:
@@ -510,7 +558,7 @@ class _Bios:
 
             # see comment in cls.install_into_mbr()
             s, e = Grub.BOOT_MACHINE_DRIVE_CHECK, Grub.BOOT_MACHINE_DRIVE_CHECK + 2
-            if tmpBootBuf[s:e] == b'\x90\x90':
+            if mvBootBuf[s:e] == b'\x90\x90':
                 bootBuf[s:e] = tmpBootBuf[s:e]
                 bAllowFloppy = False
             else:
@@ -520,22 +568,23 @@ class _Bios:
             s, e = Grub.BOOT_MACHINE_WINDOWS_NT_MAGIC, Grub.BOOT_MACHINE_PART_END
             bootBuf[s:e] = tmpBootBuf[s:e]
 
-            # do compare
+            # with all volatile regions overlayed into bootBuf, one whole
+            # sector compare (a single C-level memcmp) suffices
             if tmpBootBuf != bootBuf:
                 raise TargetError("invalid MBR record content")
 
         # compare core.img
-        if tmpRestBuf[:len(coreBuf)] == coreBuf:
+        if mvRestBuf[:len(coreBuf)] == coreBuf:
             bRsCodes = False
         else:
             coreBuf = cls._getRsEncodedCoreBuf(coreBuf, Handy.isPlatformBigEndianOrLittleEndian(platform_type))
-            if tmpRestBuf[:len(coreBuf)] == coreBuf:
+            if mvRestBuf[:len(coreBuf)] == coreBuf:
                 bRsCodes = True
             else:
                 raise TargetError("invalid on-disk core.img content")
 
         # compare rest bytes
-        if not is_buffer_all_zero(tmpRestBuf):
+        if not is_buffer_all_zero(mvRestBuf[len(coreBuf):]):
             raise TargetError("disk content after core.img should be all zero")
 
         # return
@@ -547,7 +596,7 @@ class _Bios:
     @classmethod
     def install_without_mbr(cls, platform_type, platform_install_info, source, bootDir):
         # copy boot.img
-        shutil.copy(os.path.join(source.get_platform_directory(platform_type), "boot.img"), os.path.join(bootDir, "grub", platform_type.value))
+        shutil.copyfile(os.path.join(source.get_platform_directory(platform_type), "boot.img"), os.path.join(bootDir, "grub", platform_type.value, "boot.img"))
 
         # fill custom attributes
         platform_install_info.mbr_installed = False
@@ -560,7 +609,7 @@ class _Bios:
         assert not bFloppyOrHdd and not bAllowFloppy        # FIXME
 
         # copy boot.img
-        shutil.copy(os.path.join(source.get_platform_directory(platform_type), "boot.img"), os.path.join(bootDir, "grub", platform_type.value))
+        shutil.copyfile(os.path.join(source.get_platform_directory(platform_type), "boot.img"), os.path.join(bootDir, "grub", platform_type.value, "boot.img"))
 
         bootBuf = bytearray(cls._checkAndReadBootImg(platform_type, bootDir, InstallError))     # bootBuf needs to be writable
         coreBuf = cls._checkAndReadCoreImg(platform_type, bootDir, InstallError)
@@ -593,12 +642,13 @@ class _Bios:
             if bAddRsCodes:
                 coreBuf = cls._getRsEncodedCoreBuf(coreBuf, Handy.isPlatformBigEndianOrLittleEndian(platform_type))
 
-            # write up to cls._getCoreImgMaxSize()
+            # write up to cls._getCoreImgMaxSize(), zero padding in one write
             f.seek(0)
             f.write(bootBuf)
             f.write(coreBuf)
-            for i in range(0, cls._getCoreBufMaxSize() - len(coreBuf) - len(bootBuf)):
-                f.write(b'\x00')
+            f.write(bytes(_CORE_BUF_MAX_SIZE - len(coreBuf) - len(bootBuf)))
+            f.flush()
+            os.fsync(f.fileno())
 
         # fill custom attributes
         platform_install_info.mbr_installed = True
@@ -615,11 +665,12 @@ class _Bios:
             tmpBootBuf = f.read(Grub.DISK_SECTOR_SIZE)
             allZeroBootBuf = cls._getAllZeroBootBuf(tmpBootBuf)
 
-            # write up to cls._getCoreImgMaxSize()
+            # write up to cls._getCoreImgMaxSize(), zero padding in one write
             f.seek(0)
             f.write(allZeroBootBuf)
-            for i in range(0, cls._getCoreBufMaxSize() - len(allZeroBootBuf)):
-                f.write(b'\x00')
+            f.write(bytes(_CORE_BUF_MAX_SIZE - len(allZeroBootBuf)))
+            f.flush()
+            os.fsync(f.fileno())
 
     @staticmethod
     def check_rest_files(platform_type, source, bootDir, rest_files):
@@ -638,47 +689,36 @@ class _Bios:
         if len(rest_files) > 0:
             raise CompareWithSourceError("redundant file %s found" % (rest_files[0]))
 
-    @staticmethod
-    def _getCoreBufMaxSize():
-        return Grub.DISK_SECTOR_SIZE * 1024
-
     @staticmethod
     def _getCoreBufPossibleSize(coreBuf):
         return (len(coreBuf) + Grub.DISK_SECTOR_SIZE - 1) // Grub.DISK_SECTOR_SIZE * Grub.DISK_SECTOR_SIZE * 2
 
     @classmethod
     def _checkDisk(cls, dev, exceptionClass):
+        if exceptionClass is None:
+            exceptionClass = AssertionError         # the caller treats a failure as a programming error
+
         if not PartiUtil.isDiskOrParti(dev):
-            if exceptionClass is not None:
-                raise exceptionClass("'%s' must be a disk" % (dev))
-            else:
-                assert False
+            raise exceptionClass("'%s' must be a disk" % (dev))
 
         pDev = parted.getDevice(dev)
         pDisk = parted.newDisk(pDev)
         if pDisk.type != "msdos":
-            if exceptionClass is not None:
-                raise exceptionClass("'%s' must have a MBR partition table" % (dev))
-            else:
-                assert False
+            raise exceptionClass("'%s' must have a MBR partition table" % (dev))
         pPartiList = pDisk.getPrimaryPartitions()
         if len(pPartiList) == 0:
-            if exceptionClass is not None:
-                raise exceptionClass("'%s' have no partition" % (dev))
-            else:
-                assert False
-        if pPartiList[0].geometry.start * pDev.sectorSize < cls._getCoreBufMaxSize():
-            if exceptionClass is not None:
-                raise exceptionClass("'%s' has no MBR gap or its MBR gap is too small" % (dev))
-            else:
-                assert False
+            raise exceptionClass("'%s' have no partition" % (dev))
+        if pPartiList[0].geometry.start * pDev.sectorSize < _CORE_BUF_MAX_SIZE:
+            raise exceptionClass("'%s' has no MBR gap or its MBR gap is too small" % (dev))
 
     @staticmethod
     def _checkAndReadBootImg(platform_type, bootDir, exceptionClass):
         bootImgFile = os.path.join(bootDir, "grub", platform_type.value, "boot.img")
-        if not os.path.exists(bootImgFile):
+        try:
+            with open(bootImgFile, "rb") as f:
+                bootBuf = f.read()
+        except FileNotFoundError:
             raise exceptionClass("'%s' does not exist" % (bootImgFile))
-        bootBuf = pathlib.Path(bootImgFile).read_bytes()
         if len(bootBuf) != Grub.DISK_SECTOR_SIZE:
             raise exceptionClass("the size of '%s' is not %u" % (bootImgFile, Grub.DISK_SECTOR_SIZE))
         return bootBuf
@@ -686,24 +726,22 @@ class _Bios:
     @classmethod
     def _checkAndReadCoreImg(cls, platform_type, bootDir, exceptionClass):
         coreImgFile = os.path.join(bootDir, "grub", platform_type.value, Grub.getCoreImgNameAndTarget(platform_type)[0])
-        if not os.path.exists(coreImgFile):
+        try:
+            with open(coreImgFile, "rb") as f:
+                coreBuf = f.read()
+        except FileNotFoundError:
             raise exceptionClass("'%s' does not exist" % (coreImgFile))
-        coreBuf = pathlib.Path(coreImgFile).read_bytes()
-        if not (Grub.DISK_SECTOR_SIZE <= cls._getCoreBufPossibleSize(coreBuf) <= cls._getCoreBufMaxSize()):
+        if not (Grub.DISK_SECTOR_SIZE <= cls._getCoreBufPossibleSize(coreBuf) <= _CORE_BUF_MAX_SIZE):
             raise exceptionClass("the size of '%s' is invalid" % (coreImgFile))
         return coreBuf
 
-    @staticmethod
-    def _getAllZeroBootBuf(onDiskBootBuf):
+    @classmethod
+    def _getAllZeroBootBuf(cls, onDiskBootBuf):
         allZeroBootBuf = bytearray(Grub.DISK_SECTOR_SIZE - 2) + b'\x55\xAA'
 
         # see comment in cls.install_into_mbr()
-        s, e = Grub.BOOT_MACHINE_BPB_START, Grub.BOOT_MACHINE_BPB_END
-        allZeroBootBuf[s:e] = onDiskBootBuf[s:e]
-
-        # see comment in cls.install_into_mbr()
-        s, e = Grub.BOOT_MACHINE_WINDOWS_NT_MAGIC, Grub.BOOT_MACHINE_PART_END
-        allZeroBootBuf[s:e] = onDiskBootBuf[s:e]
+        for s, e in cls._MBR_VOLATILE_REGIONS:
+            allZeroBootBuf[s:e] = onDiskBootBuf[s:e]
 
         return bytes(allZeroBootBuf)
 
@@ -773,7 +811,7 @@ class _Efi:
 
         # copy efi file
         coreName = Grub.getCoreImgNameAndTarget(platform_type)[0]
-        shutil.copy(os.path.join(grubPlatDir, coreName), os.path.join(efiDirLv2, efiFn))
+        shutil.copyfile(os.path.join(grubPlatDir, coreName), os.path.join(efiDirLv2, efiFn))
 
         # fill custom attributes
         platform_install_info.esp_is_rootfs = bUseRootfsAsEsp
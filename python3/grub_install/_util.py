@@ -23,9 +23,9 @@
 
 import os
 import re
-import shutil
+import stat
+import errno
 import pathlib
-import filecmp
 
 
 def rel_path(baseDir, path):
@@ -33,43 +33,61 @@ def rel_path(baseDir, path):
     return os.path.relpath(path, baseDir)
 
 
+def _rmtree_fast(path, dir_fd=None):
+    # like shutil.rmtree(), but walks with os.scandir on an open directory fd
+    # and removes entries relative to it, so the kernel resolves each name
+    # against the fd instead of re-traversing the whole path per entry
+    fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY | os.O_NOFOLLOW, dir_fd=dir_fd)
+    try:
+        with os.scandir(fd) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    _rmtree_fast(entry.name, dir_fd=fd)
+                else:
+                    os.unlink(entry.name, dir_fd=fd)
+    finally:
+        os.close(fd)
+    os.rmdir(path, dir_fd=dir_fd)
+
+
 def force_rm(path):
-    if os.path.islink(path):
-        os.remove(path)
-    elif os.path.isfile(path):
-        os.remove(path)
-    elif os.path.isdir(path):
-        shutil.rmtree(path)
-    elif os.path.lexists(path):
-        os.remove(path)             # other type of file, such as device node
+    try:
+        st = os.lstat(path)
+    except FileNotFoundError:
+        return                      # path does not exist, do nothing
+    if stat.S_ISDIR(st.st_mode):
+        _rmtree_fast(path)
     else:
-        pass                        # path does not exist, do nothing
+        os.remove(path)             # symlink, regular file, device node, etc.
 
 
 def force_mkdir(path, clear=False):
-    if os.path.islink(path):
-        os.remove(path)
-        os.mkdir(path)
-    elif os.path.isfile(path):
-        os.remove(path)
-        os.mkdir(path)
-    elif os.path.isdir(path):
+    try:
+        os.mkdir(path)              # common case: path does not exist, one syscall
+        return
+    except FileExistsError:
+        pass
+    st = os.lstat(path)
+    if stat.S_ISDIR(st.st_mode):
         if clear:
-            shutil.rmtree(path)
+            _rmtree_fast(path)
             os.mkdir(path)
         else:
             pass
-    elif os.path.lexists(path):
-        os.remove(path)             # other type of file, such as device node
-        os.mkdir(path)
     else:
-        os.mkdir(path)              # path does not exist
+        os.remove(path)             # symlink, regular file, device node, etc.
+        os.mkdir(path)
 
 
 def rmdir_if_empty(path):
-    if os.path.exists(path):
-        if len(os.listdir(path)) == 0:
-            os.rmdir(path)
+    # one rmdir syscall covers the exists + listdir + rmdir sequence
+    try:
+        os.rmdir(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        if e.errno != errno.ENOTEMPTY:
+            raise
 
 
 def compare_file_and_content(filepath, content):
@@ -84,63 +102,96 @@ def compare_file_and_content(filepath, content):
 def compare_files(filepath1, filepath2):
     # don't use filecmp.cmp() directly
     # filecmp.dircmp is too complex, we created function compare_files() and compare_directories()
-    return filecmp.cmp(filepath1, filepath2, shallow=False)
+    if os.path.getsize(filepath1) != os.path.getsize(filepath2):
+        return False
+    with open(filepath1, "rb") as f1, open(filepath2, "rb") as f2:
+        while True:
+            buf1 = f1.read(65536)
+            buf2 = f2.read(65536)
+            if buf1 != buf2:
+                return False
+            if not buf1:
+                return True
 
 
 def compare_directories(dirpath1, dirpath2):
-    ret1 = set(os.listdir(dirpath1))
-    ret2 = set(os.listdir(dirpath2))
-    if ret1 != ret2:
+    with os.scandir(dirpath1) as it:
+        ret1 = {entry.name: entry.stat() for entry in it}
+    with os.scandir(dirpath2) as it:
+        ret2 = {entry.name: entry.stat() for entry in it}
+    if ret1.keys() != ret2.keys():
         return False
-    for fn in ret1:
-        if not filecmp.cmp(os.path.join(dirpath1, fn), os.path.join(dirpath2, fn), shallow=False):
+    for fn, st1 in ret1.items():
+        st2 = ret2[fn]
+        if st1.st_size != st2.st_size:
+            return False
+        if st1.st_ino == st2.st_ino and st1.st_dev == st2.st_dev:
+            continue                # hard links to the same file, no need to read
+        if not compare_files(os.path.join(dirpath1, fn), os.path.join(dirpath2, fn)):
             return False
     return True
 
 
+class DirCache:
+
+    """caches directory listings, so that repeated existence queries against
+       the same parent directory cost one getdents instead of one stat each"""
+
+    def __init__(self):
+        self._cache = dict()
+
+    def children(self, dirpath):
+        ret = self._cache.get(dirpath)
+        if ret is None:
+            try:
+                with os.scandir(dirpath) as it:
+                    ret = frozenset(entry.name for entry in it)
+            except (FileNotFoundError, NotADirectoryError):
+                ret = frozenset()
+            self._cache[dirpath] = ret
+        return ret
+
+    def has_child(self, dirpath, name):
+        return name in self.children(dirpath)
+
+    def invalidate(self, dirpath=None):
+        if dirpath is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(dirpath, None)
+
+
 def is_buffer_all_zero(buf):
-    for b in buf:
-        if b != 0:
-            return False
-    return True
+    # bytes.count() scans in C, much faster than a per-byte python loop
+    buf = bytes(buf)
+    return buf.count(0) == len(buf)
 
 
 class PartiUtil:
 
+    # (disk-pattern, partition-pattern, disk-to-partition separator), compiled once
+    _DEV_PATTERNS = [
+        (re.compile("/dev/sd[a-z]"), re.compile("(/dev/sd[a-z])([0-9]+)"), ""),
+        (re.compile("/dev/xvd[a-z]"), re.compile("(/dev/xvd[a-z])([0-9]+)"), ""),
+        (re.compile("/dev/vd[a-z]"), re.compile("(/dev/vd[a-z])([0-9]+)"), ""),
+        (re.compile("/dev/nvme[0-9]+n[0-9]+"), re.compile("(/dev/nvme[0-9]+n[0-9]+)p([0-9]+)"), "p"),
+    ]
+
     @staticmethod
     def isDiskOrParti(devPath):
-        if re.fullmatch("/dev/sd[a-z]", devPath) is not None:
-            return True
-        if re.fullmatch("(/dev/sd[a-z])([0-9]+)", devPath) is not None:
-            return False
-        if re.fullmatch("/dev/xvd[a-z]", devPath) is not None:
-            return True
-        if re.fullmatch("(/dev/xvd[a-z])([0-9]+)", devPath) is not None:
-            return False
-        if re.fullmatch("/dev/vd[a-z]", devPath) is not None:
-            return True
-        if re.fullmatch("(/dev/vd[a-z])([0-9]+)", devPath) is not None:
-            return False
-        if re.fullmatch("/dev/nvme[0-9]+n[0-9]+", devPath) is not None:
-            return True
-        if re.fullmatch("(/dev/nvme[0-9]+n[0-9]+)p([0-9]+)", devPath) is not None:
-            return False
+        for diskPattern, partiPattern, sep in PartiUtil._DEV_PATTERNS:
+            if diskPattern.fullmatch(devPath) is not None:
+                return True
+            if partiPattern.fullmatch(devPath) is not None:
+                return False
         assert False
 
     @staticmethod
     def partiToDiskAndPartiId(partitionDevPath):
-        m = re.fullmatch("(/dev/sd[a-z])([0-9]+)", partitionDevPath)
-        if m is not None:
-            return (m.group(1), int(m.group(2)))
-        m = re.fullmatch("(/dev/xvd[a-z])([0-9]+)", partitionDevPath)
-        if m is not None:
-            return (m.group(1), int(m.group(2)))
-        m = re.fullmatch("(/dev/vd[a-z])([0-9]+)", partitionDevPath)
-        if m is not None:
-            return (m.group(1), int(m.group(2)))
-        m = re.fullmatch("(/dev/nvme[0-9]+n[0-9]+)p([0-9]+)", partitionDevPath)
-        if m is not None:
-            return (m.group(1), int(m.group(2)))
+        for diskPattern, partiPattern, sep in PartiUtil._DEV_PATTERNS:
+            m = partiPattern.fullmatch(partitionDevPath)
+            if m is not None:
+                return (m.group(1), int(m.group(2)))
         assert False
 
     @staticmethod
@@ -149,18 +200,9 @@ class PartiUtil:
 
     @staticmethod
     def diskToParti(diskDevPath, partitionId):
-        m = re.fullmatch("/dev/sd[a-z]", diskDevPath)
-        if m is not None:
-            return diskDevPath + str(partitionId)
-        m = re.fullmatch("/dev/xvd[a-z]", diskDevPath)
-        if m is not None:
-            return diskDevPath + str(partitionId)
-        m = re.fullmatch("/dev/vd[a-z]", diskDevPath)
-        if m is not None:
-            return diskDevPath + str(partitionId)
-        m = re.fullmatch("/dev/nvme[0-9]+n[0-9]+", diskDevPath)
-        if m is not None:
-            return diskDevPath + "p" + str(partitionId)
+        for diskPattern, partiPattern, sep in PartiUtil._DEV_PATTERNS:
+            if diskPattern.fullmatch(diskDevPath) is not None:
+                return diskDevPath + sep + str(partitionId)
         assert False
 
     @staticmethod
@@ -170,8 +212,9 @@ class PartiUtil:
 
     @staticmethod
     def diskHasMoreParti(diskDevPath, partitionId):
+        pattern = re.compile(re.escape(os.path.basename(diskDevPath)) + "([0-9]+)")
         for fn in os.listdir("/dev"):
-            m = re.fullmatch(os.path.basename(diskDevPath) + "([0-9]+)", fn)
+            m = pattern.fullmatch(fn)
             if m is not None and int(m.group(1)) > partitionId:
                 return True
         return False